@@ -6,6 +6,8 @@ from deephaven import time_table, new_table, input_table, DynamicTableWriter
 from deephaven.column import string_col, double_col
 import deephaven.dtypes as dht
 from deephaven.updateby import ema_time, emstd_time, cum_min
+from deephaven.table_listener import listen
+from deephaven.time import to_j_instant
 from deephaven.plot import Figure, PlotStyle
 from deephaven.plot.selectable_dataset import one_click
 
@@ -114,22 +116,36 @@ orders = preds.last_by(["Sym"]) \
 # Simulate trading
 ############################################################################################################
 
-def simulate_1_lot(date, timestamp, sym, bid, ask, pred_buy, pred_sell, is_buy_active, is_sell_active) -> str:
-    """ Simulate a trade of 1 lot based on the current state of the market and predictions. """
+lot_size = 100
 
-    if is_buy_active and ask < pred_buy:
-        trades_writer.write_row(date, timestamp, sym, ask, 100)
-        return "BUY"
+executions = orders \
+    .snapshot_when(time_table("PT00:00:10"), stamp_cols="SnapTime=Timestamp") \
+    .update([
+        "Action = (BuyActive && AskPrice < PredBuy) ? `BUY` : (SellActive && BidPrice > PredSell) ? `SELL` : `NO TRADE`",
+        "TradePrice = Action == `BUY` ? AskPrice : BidPrice",
+        "TradeSize = Action == `BUY` ? lot_size : Action == `SELL` ? -lot_size : 0",
+    ])
 
-    if is_sell_active and bid > pred_sell:
-        trades_writer.write_row(date, timestamp, sym, bid, -100)
-        return "SELL"
 
-    return "NO TRADE"
+def record_trades(update, is_replay):
+    """ Record a simulated trade for each execution that buys or sells. """
 
-executions = orders \
-    .snapshot_when(time_table("PT00:00:10"), stamp_cols="SnapTime=Timestamp") \
-    .update("Size = simulate_1_lot(Date, Timestamp, Sym, BidPrice, AskPrice, PredBuy, PredSell, BuyActive, SellActive)")
+    write_row = trades_writer.write_row
+
+    for rows in (update.added(), update.modified()):
+        if not rows:
+            continue
+
+        for date, timestamp, sym, price, size in zip(
+                rows["Date"], rows["Timestamp"], rows["Sym"], rows["TradePrice"].tolist(), rows["TradeSize"].tolist()):
+            write_row(date, to_j_instant(timestamp), sym, price, size)
+
+
+trade_executions = executions.where("Action != `NO TRADE`")
+handle = listen(trade_executions, record_trades)
+
+# Run handle.stop() to stop simulated trading
+# Run handle.start() to restart simulated trading
 
 
 ############################################################################################################